@@ -1,6 +1,14 @@
+import time
+MODULE_LOAD_STARTED = time.perf_counter()
+
 import os
 from datetime import datetime, timedelta
 import logging
+import logging.handlers
+import queue
+import atexit
+import signal
+import threading
 from telegram import (
     InlineKeyboardButton, 
     InlineKeyboardMarkup, 
@@ -8,10 +16,6 @@ from telegram import (
     InputMediaPhoto,
     InlineQueryResultArticle,
     InputTextMessageContent,
-    ReplyKeyboardMarkup,
-    KeyboardButton,
-    InlineKeyboardMarkup,
-    ReplyKeyboardRemove,
     CallbackQuery
 )
 from telegram.ext import (
@@ -22,28 +26,158 @@ from telegram.ext import (
     filters,
     ContextTypes,
     InlineQueryHandler,
-    ConversationHandler
+    PicklePersistence
 )
+from telegram.error import BadRequest
+from telegram.request import HTTPXRequest
 import aiohttp
 import asyncio
 from aiohttp import web
 import json
-from urllib.parse import quote
-import re
-from typing import Dict, List, Optional, Union
-import html
-from prometheus_client import Counter, Histogram
-import schedule
-import time
-import threading
-import unittest
+from typing import Dict, List, Optional
 import hashlib
+import contextvars
+import heapq
+import random
+import secrets
+import mmap
+import struct
+import zlib
+from collections import OrderedDict, deque
+from array import array
+from bisect import bisect_left
+
+# prometheus_client is imported on first use to keep cold start short
+IMPORT_SECONDS = time.perf_counter() - MODULE_LOAD_STARTED
 
 # Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; message args are merged here, in the writer thread"""
+
+    EXTRA_FIELDS = ('update', 'suppressed')
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for field in self.EXTRA_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records as-is so formatting happens on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class RepeatFilter(logging.Filter):
+    """Let through at most `burst` identical warnings or errors per window"""
+
+    def __init__(self, burst: int = 5, window: float = 60.0, max_keys: int = 10000):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.seen = {}  # key -> [window_start, count, first record]
+
+    @staticmethod
+    def _freeze(arg):
+        return arg if isinstance(arg, (str, int, float, bool, type(None))) else repr(arg)
+
+    def _key(self, record: logging.LogRecord) -> tuple:
+        # Template plus arguments and exception type, so only true repeats share a key
+        args = record.args if isinstance(record.args, tuple) else (record.args,)
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        return (
+            record.name, record.levelno, str(record.msg), exc_type,
+            tuple(self._freeze(arg) for arg in args)
+        )
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or hasattr(record, 'suppressed'):
+            return True
+
+        now = time.monotonic()
+        key = self._key(record)
+        summaries = []
+        with self.lock:
+            state = self.seen.get(key)
+            if state is None or now - state[0] > self.window:
+                # Report windows closed here before their counts are replaced
+                if state is not None:
+                    summaries += self._closed(state)
+                if len(self.seen) >= self.max_keys:
+                    for closed in self.seen.values():
+                        summaries += self._closed(closed)
+                    self.seen.clear()
+                self.seen[key] = [now, 1, record]
+                allowed = True
+            else:
+                state[1] += 1
+                allowed = state[1] <= self.burst
+
+        self._report(summaries)
+        return allowed
+
+    def _closed(self, state: list) -> list:
+        started, count, record = state
+        return [(record, count - self.burst)] if count > self.burst else []
+
+    def flush_expired(self):
+        """Close finished windows and report how many repeats each one swallowed"""
+        now = time.monotonic()
+        summaries = []
+        with self.lock:
+            for key, state in list(self.seen.items()):
+                if now - state[0] > self.window:
+                    del self.seen[key]
+                    summaries += self._closed(state)
+        self._report(summaries)
+
+    @staticmethod
+    def _report(summaries: list):
+        # Logged outside the lock, since these records pass through filter() again
+        for record, suppressed in summaries:
+            logging.getLogger(record.name).log(
+                record.levelno, "Suppressed %s repeats of: %s", suppressed, record.getMessage(),
+                extra={'suppressed': suppressed}
+            )
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a writer thread"""
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    repeat_filter = RepeatFilter()
+    queue_handler.addFilter(repeat_filter)
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # Report suppressed repeats as soon as their window ends
+    def sweep_repeats():
+        while True:
+            time.sleep(5)
+            repeat_filter.flush_expired()
+
+    threading.Thread(target=sweep_repeats, name='log-repeat-sweep', daemon=True).start()
+    return listener
+
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
 # Constants
@@ -52,44 +186,1054 @@ TMDB_API_KEY = '69084ded6889a849708077681bd5dd7f'
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
 TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
 PORT = 10000
+CACHE_SNAPSHOT_PATH = os.environ.get('CACHE_SNAPSHOT_PATH', 'cache_snapshot.bin')
+USER_STATE_PATH = os.environ.get('USER_STATE_PATH', 'user_state.pickle')
+FEEDBACK_DIR = os.environ.get('FEEDBACK_DIR', 'feedback')
+FEEDBACK_SEGMENT_BYTES = 4 * 1024 * 1024
+
+# Per-update tracing (0 disables it)
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+SLOW_TRACES_KEPT = 20
+
+# Outbound TMDB budget (shared by every call made with our API key)
+TMDB_RATE_PER_SECOND = 40
+TMDB_BURST = 20
+
+# TMDB response cache lifetimes (seconds); details are kept fresh by the change feed
+DETAIL_CACHE_TTL = 3 * 24 * 3600
+LIST_CACHE_TTL = 10 * 60
+CHANGES_POLL_INTERVAL = 60 * 60
+
+# Warm-restart snapshot of hot caches
+SNAPSHOT_MAGIC = b'CNPHSNAP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_INTERVAL = 5 * 60
+SNAPSHOT_HEADER = struct.Struct('<8sHIQI')  # magic, version, entries, index offset, index crc32
+SNAPSHOT_ENTRY = struct.Struct('<dQIIH')  # expires_at, offset, length, crc32, key length
+POSTER_SNAPSHOT_KEY = '["posters"]'
+POSTER_SNAPSHOT_TTL = 30 * 24 * 3600
+
+# Shared watchlists answered from memory in inline mode
+SHARE_PREFIX = 'share_'
+SHARE_CACHE_TIME = 24 * 3600
+SHARE_INLINE_TITLES = 49  # Inline answers hold 50 results; the first is the whole list
+
+# TV navigation layout
+SEASONS_PER_PAGE = 12
+SEASON_GRID_COLUMNS = 3
+EPISODES_PER_PAGE = 5
 
 # Conversation states
 SELECTING_SEASON, SELECTING_EPISODE = range(2)
 
+class LazyMetric:
+    """Prometheus metric that is only created (and imported) on first use"""
+
+    def __init__(self, kind: str, *args, **kwargs):
+        self.kind = kind
+        self.args = args
+        self.kwargs = kwargs
+        self.metric = None
+
+    def __getattr__(self, name):
+        if self.metric is None:
+            import prometheus_client
+            self.metric = getattr(prometheus_client, self.kind)(*self.args, **self.kwargs)
+        return getattr(self.metric, name)
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+class NullSpan:
+    """Shared no-op span used whenever the update is not sampled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    def __init__(self, trace: dict, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # Background tasks inherit the context; ignore spans after the trace closed
+        if 'duration_ms' not in self.trace:
+            self.trace['spans'].append({
+                'name': self.name,
+                'offset_ms': round((self.started - self.trace['perf_started']) * 1000, 1),
+                'duration_ms': round((time.perf_counter() - self.started) * 1000, 1),
+                'error': exc_type.__name__ if exc_type else None
+            })
+        return False
+
+class TraceContext:
+    def __init__(self, tracer: 'Tracer', name: str, detail: str):
+        self.tracer = tracer
+        self.trace = {'name': name, 'detail': detail, 'spans': []}
+
+    def __enter__(self):
+        self.trace['started'] = datetime.now().isoformat()
+        self.trace['perf_started'] = time.perf_counter()
+        self.token = current_trace.set(self.trace)
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        current_trace.reset(self.token)
+        self.trace['duration_ms'] = round(
+            (time.perf_counter() - self.trace.pop('perf_started')) * 1000, 1
+        )
+        self.trace['error'] = exc_type.__name__ if exc_type else None
+        self.tracer.record(self.trace)
+        return False
+
+class Tracer:
+    """Sampled per-update traces, keeping only the slowest few"""
+
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, keep: int = SLOW_TRACES_KEPT):
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.slowest = []  # Min-heap of (duration_ms, seq, trace)
+        self.seq = 0
+
+    def trace(self, name: str, detail: str = ''):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return NULL_SPAN
+        return TraceContext(self, name, detail)
+
+    def span(self, name: str):
+        trace = current_trace.get()
+        if trace is None:
+            return NULL_SPAN
+        return Span(trace, name)
+
+    def record(self, trace: dict):
+        self.seq += 1
+        entry = (trace['duration_ms'], self.seq, trace)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, entry)
+        elif entry[0] > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def report(self) -> List[dict]:
+        return [trace for _, _, trace in sorted(self.slowest, reverse=True)]
+
+class TracedRequest(HTTPXRequest):
+    """Bot API requests recorded as spans on the current trace"""
+
+    def __init__(self, tracer: Tracer, **kwargs):
+        super().__init__(**kwargs)
+        self.tracer = tracer
+
+    async def do_request(self, url: str, *args, **kwargs):
+        with self.tracer.span(f"telegram.{url.rsplit('/', 1)[-1]}"):
+            return await super().do_request(url, *args, **kwargs)
+
+class CircuitBreaker:
+    """Opens after repeated TMDB failures so calls fail fast during an outage"""
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        return self.state() != 'open'
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+class OverloadController:
+    """Steps through degradation levels based on loop lag, queue depth and TMDB health"""
+
+    LEVELS = ('normal', 'skip_enrichment', 'text_only', 'cached_only', 'reject')
+    LAG_THRESHOLDS = (0.1, 0.25, 0.5, 1.0)  # Seconds of event loop lag for levels 1-4
+    QUEUE_THRESHOLDS = (20, 50, 100, 200)  # Pending updates for levels 1-4
+
+    LEVEL = LazyMetric('Gauge', 'overload_level', 'Current degradation level')
+    LOOP_LAG = LazyMetric('Gauge', 'event_loop_lag_seconds', 'Measured event loop lag')
+    DEGRADED = LazyMetric(
+        'Counter', 'overload_degraded_total', 'Updates received at a degraded level', ['level']
+    )
+
+    def __init__(self, queue_depth, circuit: CircuitBreaker,
+                 interval: float = 0.5, cooldown: float = 10.0):
+        self.queue_depth = queue_depth
+        self.circuit = circuit
+        self.interval = interval
+        self.cooldown = cooldown
+        self.level = 0
+        self.lag = 0.0
+        self.changed_at = time.monotonic()
+
+    @staticmethod
+    def _score(value: float, thresholds: tuple) -> int:
+        return sum(value > threshold for threshold in thresholds)
+
+    def update(self, lag: float):
+        """Raise the level immediately, lower it one step per cooldown"""
+        self.lag = lag
+        target = max(
+            self._score(lag, self.LAG_THRESHOLDS),
+            self._score(self.queue_depth(), self.QUEUE_THRESHOLDS),
+            3 if self.circuit.state() == 'open' else 0
+        )
+
+        now = time.monotonic()
+        if target > self.level:
+            self.level = target
+            self.changed_at = now
+        elif target < self.level and now - self.changed_at >= self.cooldown:
+            self.level -= 1
+            self.changed_at = now
+
+        self.LEVEL.set(self.level)
+        self.LOOP_LAG.set(lag)
+
+    async def run(self):
+        """Measure how late the loop wakes us up and feed it to update()"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.update(max(0.0, loop.time() - started - self.interval))
+
+    def admit(self) -> int:
+        """Count one incoming update at the current level and return that level"""
+        level = self.level
+        if level:
+            self.DEGRADED.labels(self.LEVELS[level]).inc()
+        return level
+
+    def degraded(self, level: int) -> bool:
+        """True if requests should currently degrade to this level"""
+        return self.level >= level
+
+    def stats(self) -> dict:
+        return {
+            "level": self.LEVELS[self.level],
+            "loop_lag": round(self.lag, 3),
+            "queue_depth": self.queue_depth(),
+            "tmdb_circuit": self.circuit.state()
+        }
+
+class TmdbScheduler:
+    """Token bucket with weighted fair queueing across priority classes"""
+
+    # Interactive requests get the biggest share, but batch work still drains
+    WEIGHTS = {'interactive': 6, 'prefetch': 3, 'batch': 1}
+
+    QUEUE_WAIT = LazyMetric(
+        'Histogram',
+        'tmdb_queue_wait_seconds',
+        'Time TMDB requests spend waiting for a rate budget token',
+        ['priority']
+    )
+
+    def __init__(self, rate: float = TMDB_RATE_PER_SECOND, burst: int = TMDB_BURST):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.queues = {priority: deque() for priority in self.WEIGHTS}
+        self.credits = {priority: 0 for priority in self.WEIGHTS}
+        self._dispatcher = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take_token(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def _next_priority(self) -> Optional[str]:
+        """Pick the next class to serve using smooth weighted round-robin"""
+        for waiting in self.queues.values():
+            while waiting and waiting[0].done():
+                waiting.popleft()
+
+        active = [priority for priority, waiting in self.queues.items() if waiting]
+        if not active:
+            return None
+
+        total = sum(self.WEIGHTS[priority] for priority in active)
+        for priority in active:
+            self.credits[priority] += self.WEIGHTS[priority]
+        chosen = max(active, key=lambda priority: self.credits[priority])
+        self.credits[chosen] -= total
+        return chosen
+
+    async def _dispatch(self):
+        while True:
+            priority = self._next_priority()
+            if priority is None:
+                return
+            if not self._take_token():
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+            self.queues[priority].popleft().set_result(None)
+
+    async def acquire(self, priority: str = 'interactive'):
+        """Wait until a request of the given class may go out"""
+        if priority not in self.queues:
+            priority = 'interactive'
+        enqueued = time.monotonic()
+
+        # Fast path: nothing queued and budget available
+        if not any(self.queues.values()) and self._take_token():
+            self.QUEUE_WAIT.labels(priority).observe(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.queues[priority].append(future)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        await future
+        self.QUEUE_WAIT.labels(priority).observe(time.monotonic() - enqueued)
+
+    def stats(self) -> dict:
+        """Current queue depth per priority class"""
+        return {
+            priority: sum(1 for future in waiting if not future.done())
+            for priority, waiting in self.queues.items()
+        }
+
+def parse_title_endpoint(endpoint: str) -> Optional[tuple]:
+    """Return (media_type, id) for /movie/{id}... and /tv/{id}... endpoints"""
+    parts = endpoint.strip('/').split('/')
+    if len(parts) >= 2 and parts[0] in ('movie', 'tv') and parts[1].isdigit():
+        return parts[0], parts[1]
+    return None
+
+class SnapshotReader:
+    """Memory-mapped cache snapshot; records are only decoded when asked for"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, index_offset, index_crc = SNAPSHOT_HEADER.unpack_from(self.map, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {version}")
+
+            index = self.map[index_offset:]
+            if zlib.crc32(index) != index_crc:
+                raise ValueError("snapshot index checksum mismatch")
+        except Exception:
+            self.close()
+            raise
+
+        # Only the small index is parsed up front; expired records are skipped
+        now = time.time()
+        self.index = {}  # key -> (expires_at, offset, length, crc32)
+        pos = 0
+        for _ in range(count):
+            expires_at, offset, length, crc, key_length = SNAPSHOT_ENTRY.unpack_from(index, pos)
+            pos += SNAPSHOT_ENTRY.size
+            key = index[pos:pos + key_length].decode()
+            pos += key_length
+            if expires_at > now:
+                self.index[key] = (expires_at, offset, length, crc)
+
+    def raw(self, key: str) -> bytes:
+        _, offset, length, _ = self.index[key]
+        return self.map[offset:offset + length]
+
+    def load(self, key: str) -> Optional[tuple]:
+        """Decode one record as (expires_at, value), or None if missing, stale or corrupt"""
+        entry = self.index.get(key)
+        if entry is None or entry[0] < time.time():
+            return None
+        blob = self.raw(key)
+        if zlib.crc32(blob) != entry[3]:
+            logger.warning("Dropping corrupt snapshot record %s", key)
+            del self.index[key]
+            return None
+        return entry[0], json.loads(zlib.decompress(blob))
+
+    def forget(self, key: str):
+        self.index.pop(key, None)
+
+    def close(self):
+        if getattr(self, 'map', None) is not None:
+            self.map.close()
+        self.file.close()
+
+def write_snapshot(path: str, records: list, previous: Optional[SnapshotReader]):
+    """Write (key, expires_at, value) records; a slice value copies those bytes from previous"""
+    index = bytearray()
+    offset = SNAPSHOT_HEADER.size
+    with open(f"{path}.tmp", 'wb') as f:
+        f.write(bytes(SNAPSHOT_HEADER.size))
+        for key, expires_at, value in records:
+            if isinstance(value, slice):
+                blob = previous.map[value]
+            else:
+                blob = zlib.compress(json.dumps(value, separators=(',', ':')).encode())
+            f.write(blob)
+
+            encoded_key = key.encode()
+            index += SNAPSHOT_ENTRY.pack(
+                expires_at, offset, len(blob), zlib.crc32(blob), len(encoded_key)
+            )
+            index += encoded_key
+            offset += len(blob)
+
+        f.write(index)
+        f.seek(0)
+        f.write(SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(records), offset, zlib.crc32(index)
+        ))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+class TmdbCache:
+    """LRU of TMDB JSON responses with per-endpoint TTLs"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (endpoint, params) -> (expires_at, payload)
+        self.listeners = []  # Called with (media_type, id) when a title entry changes
+        self.snapshot: Optional[SnapshotReader] = None  # Lazily consulted on misses
+        self.dirty = set()  # Keys stored since the last snapshot
+        self.forgotten = set()  # Snapshot keys dropped since the last snapshot
+
+    @staticmethod
+    def key(endpoint: str, params: dict) -> tuple:
+        return endpoint, tuple(sorted(
+            (name, str(value)) for name, value in params.items() if name != 'api_key'
+        ))
+
+    @staticmethod
+    def ttl_for(endpoint: str) -> int:
+        return DETAIL_CACHE_TTL if parse_title_endpoint(endpoint) else LIST_CACHE_TTL
+
+    def _notify(self, key: tuple):
+        title = parse_title_endpoint(key[0])
+        if title:
+            for listener in self.listeners:
+                listener(*title)
+
+    @staticmethod
+    def snapshot_key(key: tuple) -> str:
+        return json.dumps(['tmdb', key[0], key[1]], separators=(',', ':'))
+
+    def _drop(self, key: tuple):
+        del self.entries[key]
+        self.dirty.discard(key)
+        if self.snapshot is not None:
+            snapshot_key = self.snapshot_key(key)
+            self.snapshot.forget(snapshot_key)
+            self.forgotten.add(snapshot_key)
+        self._notify(key)
+
+    def get(self, endpoint: str, params: dict) -> Optional[dict]:
+        key = self.key(endpoint, params)
+        entry = self.entries.get(key)
+        if entry is None and self.snapshot is not None:
+            entry = self.snapshot.load(self.snapshot_key(key))
+            if entry is not None:
+                self.entries[key] = entry
+                while len(self.entries) > self.max_entries:
+                    self._drop(next(iter(self.entries)))
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, endpoint: str, params: dict, payload: dict):
+        key = self.key(endpoint, params)
+        refreshed = key in self.entries
+        self.entries[key] = (time.time() + self.ttl_for(endpoint), payload)
+        self.entries.move_to_end(key)
+        self.dirty.add(key)
+        if refreshed:
+            self._notify(key)
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+
+    def snapshot_records(self) -> Dict[str, tuple]:
+        """Records for the next snapshot; unchanged ones are copied from the current file"""
+        now = time.time()
+        records = {}
+        if self.snapshot is not None:
+            for snapshot_key, (expires_at, offset, length, _) in self.snapshot.index.items():
+                if expires_at > now:
+                    records[snapshot_key] = (expires_at, slice(offset, offset + length))
+
+        for key, (expires_at, payload) in self.entries.items():
+            snapshot_key = self.snapshot_key(key)
+            if expires_at > now and (key in self.dirty or snapshot_key not in records):
+                records[snapshot_key] = (expires_at, payload)
+
+        self.dirty.clear()
+        self.forgotten.clear()
+        return records
+
+    def invalidate_titles(self, media_type: str, item_ids: set) -> List[tuple]:
+        """Drop every cached response for the given titles; returns the live keys dropped"""
+        def changed(endpoint: str) -> bool:
+            title = parse_title_endpoint(endpoint)
+            return title is not None and title[0] == media_type and title[1] in item_ids
+
+        dropped = [key for key in self.entries if changed(key[0])]
+        for key in dropped:
+            self._drop(key)
+
+        # Records not yet loaded from the snapshot must not come back either
+        if self.snapshot is not None:
+            for snapshot_key in list(self.snapshot.index):
+                namespace, *rest = json.loads(snapshot_key)
+                if namespace == 'tmdb' and changed(rest[0]):
+                    self.snapshot.forget(snapshot_key)
+                    self.forgotten.add(snapshot_key)
+                    for listener in self.listeners:
+                        listener(*parse_title_endpoint(rest[0]))
+        return dropped
+
+class ChangeFeedWorker:
+    """Polls TMDB's change lists and reports which titles changed"""
+
+    def __init__(self, fetch, on_change, interval: int = CHANGES_POLL_INTERVAL):
+        self.fetch = fetch  # async (endpoint, params) -> dict; a fake can stand in for TMDB
+        self.on_change = on_change  # (media_type, set of ids)
+        self.interval = interval
+        # Cached entries may be as old as the detail TTL, so look back that far first
+        self.since = datetime.now() - timedelta(seconds=DETAIL_CACHE_TTL)
+
+    async def poll_once(self):
+        started = datetime.now()
+        # TMDB filters by date only, so every poll re-reports the whole day. That is
+        # kept on purpose: a title edited twice in one day must be evicted twice, and
+        # invalidation only touches titles that are actually cached.
+        start_date = self.since.strftime('%Y-%m-%d')
+        for media_type in ('movie', 'tv'):
+            changed = set()
+            page, total_pages = 1, 1
+            while page <= total_pages:
+                data = await self.fetch(
+                    f"/{media_type}/changes",
+                    {"start_date": start_date, "page": page}
+                )
+                if 'page' not in data:
+                    raise RuntimeError(f"Could not fetch {media_type} changes")
+                changed.update(str(item['id']) for item in data.get('results', []))
+                total_pages = data.get('total_pages', 1)
+                page += 1
+            if changed:
+                self.on_change(media_type, changed)
+
+        # Only move the window forward once both feeds were read completely
+        self.since = started
+
+    async def run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error("Error polling TMDB changes: %s", e)
+            await asyncio.sleep(self.interval)
+
+class RenderedCardCache:
+    """Final photo, caption, parse mode and keyboard per (media_type, id, language)"""
+
+    def __init__(self, max_titles: int = 1024):
+        self.max_titles = max_titles
+        self.cards = OrderedDict()  # (media_type, id) -> {language: card}
+
+    def get(self, media_type: str, item_id: str, language: str) -> Optional[tuple]:
+        languages = self.cards.get((media_type, item_id))
+        if not languages or language not in languages:
+            return None
+        self.cards.move_to_end((media_type, item_id))
+        return languages[language]
+
+    def put(self, media_type: str, item_id: str, language: str, card: tuple):
+        self.cards.setdefault((media_type, item_id), {})[language] = card
+        self.cards.move_to_end((media_type, item_id))
+        while len(self.cards) > self.max_titles:
+            self.cards.popitem(last=False)
+
+    def invalidate(self, media_type: str, item_id: str):
+        self.cards.pop((media_type, item_id), None)
+
+class SimilarityIndex:
+    """In-memory top-K neighbour lists behind the Similar button"""
+
+    def __init__(self, top_k: int = 8, max_sources: int = 2048, max_titles: int = 32768):
+        self.top_k = top_k
+        self.max_sources = max_sources
+        self.max_titles = max_titles
+        self.titles = OrderedDict()  # id -> title, LRU shared by sources and candidates
+        self.genre_bits: Dict[int, int] = {}
+        self.genres: Dict[str, int] = {}  # Genre bitmask per title in self.titles
+        self.cast: Dict[str, frozenset] = {}  # Top billed cast ids per source
+        self.cast_titles: Dict[int, set] = {}  # Cast id -> sources featuring them
+        self.neighbors = OrderedDict()  # Source id -> precomputed (score, id), best first; LRU
+        self.co_saves: Dict[str, Dict[str, int]] = {}
+
+    def _genre_mask(self, genre_ids) -> int:
+        mask = 0
+        for genre_id in genre_ids:
+            bit = self.genre_bits.setdefault(genre_id, len(self.genre_bits))
+            mask |= 1 << bit
+        return mask
+
+    def _remember(self, item: dict) -> str:
+        item_id = str(item['id'])
+        self.titles[item_id] = item.get('title') or item.get('name', 'Unknown')
+        self.titles.move_to_end(item_id)
+        genre_ids = item.get('genre_ids') or [genre['id'] for genre in item.get('genres', [])]
+        self.genres[item_id] = self._genre_mask(genre_ids)
+        while len(self.titles) > self.max_titles:
+            evicted, _ = self.titles.popitem(last=False)
+            self.genres.pop(evicted, None)
+        return item_id
+
+    def forget(self, source: str):
+        """Drop a source's neighbour list and its cast postings"""
+        self.neighbors.pop(source, None)
+        for actor in self.cast.pop(source, frozenset()):
+            sources = self.cast_titles.get(actor)
+            if sources is not None:
+                sources.discard(source)
+                if not sources:
+                    del self.cast_titles[actor]
+
+    def _static_score(self, source: str, candidate: str, rank_bonus: float) -> float:
+        source_genres = self.genres.get(source, 0)
+        candidate_genres = self.genres.get(candidate, 0)
+        union = bin(source_genres | candidate_genres).count('1')
+        genre_overlap = bin(source_genres & candidate_genres).count('1') / union if union else 0
+        cast_overlap = len(self.cast.get(source, frozenset()) & self.cast.get(candidate, frozenset()))
+        return rank_bonus + genre_overlap + 0.5 * cast_overlap
+
+    def build(self, movie_data: dict):
+        """Precompute neighbours from details with credits, similar and recommendations appended"""
+        source = self._remember(movie_data)
+        self.forget(source)
+        self.cast[source] = frozenset(
+            actor['id'] for actor in movie_data.get('credits', {}).get('cast', [])[:10]
+        )
+        for actor in self.cast[source]:
+            self.cast_titles.setdefault(actor, set()).add(source)
+
+        # TMDB candidates, weighted by their rank in each list
+        rank_bonus = {}
+        for key in ('recommendations', 'similar'):
+            results = movie_data.get(key, {}).get('results', [])
+            for rank, item in enumerate(results):
+                candidate = self._remember(item)
+                if candidate != source:
+                    bonus = 1 - rank / len(results)
+                    rank_bonus[candidate] = max(rank_bonus.get(candidate, 0), bonus)
+
+        # Already indexed titles sharing cast members
+        for actor in self.cast[source]:
+            for candidate in self.cast_titles[actor]:
+                if candidate != source:
+                    rank_bonus.setdefault(candidate, 0)
+
+        scored = sorted(
+            ((self._static_score(source, candidate, bonus), candidate)
+             for candidate, bonus in rank_bonus.items()),
+            reverse=True
+        )
+        self.neighbors[source] = scored[:self.top_k * 2]
+        while len(self.neighbors) > self.max_sources:
+            self.forget(next(iter(self.neighbors)))
+
+    def add_co_save(self, item_id: str, others, delta: int = 1):
+        """Record that item_id was saved or liked together with others"""
+        for other in others:
+            if other == item_id:
+                continue
+            for a, b in ((item_id, other), (other, item_id)):
+                counts = self.co_saves.setdefault(a, {})
+                counts[b] = counts.get(b, 0) + delta
+                if counts[b] <= 0:
+                    del counts[b]
+
+    def rebuild_co_saves(self, collections) -> int:
+        """Recount co-saves from every user's combined saved and liked set"""
+        self.co_saves = {}
+        for items in collections:
+            items = list(items)
+            for position, item_id in enumerate(items):
+                self.add_co_save(item_id, items[position + 1:])
+        return len(self.co_saves)
+
+    def similar(self, item_id: str) -> Optional[List[tuple]]:
+        """Return up to top_k (id, title) pairs, or None if not precomputed yet"""
+        if item_id not in self.neighbors:
+            return None
+        self.neighbors.move_to_end(item_id)
+
+        scores = {candidate: score for score, candidate in self.neighbors[item_id]}
+        for other, count in self.co_saves.get(item_id, {}).items():
+            scores[other] = scores.get(other, 0) + 0.25 * count
+
+        ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)
+        return [
+            (candidate, self.titles[candidate])
+            for candidate, _ in ranked if candidate in self.titles
+        ][:self.top_k]
+
+class SeasonTableCache:
+    """LRU of compact episode tables keyed by (show, season)"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.tables = OrderedDict()
+
+    def get(self, show_id: str, season_number: str) -> Optional[tuple]:
+        key = (show_id, season_number)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+        return table
+
+    def put(self, show_id: str, season_number: str, season_data: dict) -> tuple:
+        """Keep only what the episode list renders: air date and (number, name) pairs"""
+        episodes = tuple(
+            (episode.get('episode_number'),
+             episode.get('name') or f"Episode {episode.get('episode_number')}")
+            for episode in season_data.get('episodes', [])
+        )
+        table = (season_data.get('air_date') or 'N/A', episodes)
+
+        self.tables[(show_id, season_number)] = table
+        self.tables.move_to_end((show_id, season_number))
+        while len(self.tables) > self.max_entries:
+            self.tables.popitem(last=False)
+        return table
+
+    def invalidate(self, media_type: str, item_id: str):
+        """Drop every season table of a show whose TMDB data changed"""
+        if media_type != 'tv':
+            return
+        for key in [key for key in self.tables if key[0] == item_id]:
+            del self.tables[key]
+
+class WatchlistShares:
+    """Pre-rendered inline results for shared watchlists, keyed by opaque token"""
+
+    def __init__(self, max_shares: int = 10000):
+        self.max_shares = max_shares
+        self.shares = OrderedDict()  # token -> (user_id, text, inline results)
+        self.tokens = {}  # user_id -> current token
+
+    def get(self, token: str) -> Optional[tuple]:
+        return self.shares.get(token)
+
+    def for_user(self, user_id: int) -> Optional[tuple]:
+        token = self.tokens.get(user_id)
+        if token is None:
+            return None
+        return token, self.shares[token]
+
+    def put(self, user_id: int, text: str, results: list) -> str:
+        # A fresh token per render, so Telegram's inline cache never serves an old list
+        self.invalidate(user_id)
+        token = secrets.token_urlsafe(12)
+        self.shares[token] = (user_id, text, results)
+        self.tokens[user_id] = token
+        while len(self.shares) > self.max_shares:
+            _, (old_user_id, _, _) = self.shares.popitem(last=False)
+            self.tokens.pop(old_user_id, None)
+        return token
+
+    def invalidate(self, user_id: int):
+        token = self.tokens.pop(user_id, None)
+        if token is not None:
+            self.shares.pop(token, None)
+
+class WatcherIndex:
+    """Reverse index from title ID to the sorted IDs of users who saved it"""
+
+    def __init__(self, store: dict):
+        self.store = store  # title_id -> array('q') of user IDs, kept sorted
+
+    def add(self, title_id: str, user_id: int):
+        watchers = self.store.setdefault(title_id, array('q'))
+        pos = bisect_left(watchers, user_id)
+        if pos == len(watchers) or watchers[pos] != user_id:
+            watchers.insert(pos, user_id)
+
+    def remove(self, title_id: str, user_id: int):
+        watchers = self.store.get(title_id)
+        if not watchers:
+            return
+        pos = bisect_left(watchers, user_id)
+        if pos < len(watchers) and watchers[pos] == user_id:
+            del watchers[pos]
+        if not watchers:
+            del self.store[title_id]
+
+    def watchers(self, title_id: str) -> array:
+        return self.store.get(title_id, array('q'))
+
+    def count(self, title_id: str) -> int:
+        return len(self.store.get(title_id, ()))
+
+    def rebuild(self, user_data) -> int:
+        """Recreate the index from every user's watchlist"""
+        self.store.clear()
+        for user_id, data in user_data.items():
+            for title_id in data.get('watchlist', []):
+                self.add(title_id, user_id)
+        return len(self.store)
+
+class FeedbackLog:
+    """Append-only JSONL feedback segments fed by an in-process queue"""
+
+    def __init__(self, directory: str = FEEDBACK_DIR,
+                 segment_bytes: int = FEEDBACK_SEGMENT_BYTES,
+                 batch_size: int = 200, max_pending: int = 10000):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.failed_batch: List[dict] = []  # Accepted entries waiting for a retry
+
+    @staticmethod
+    def segments(directory: str = FEEDBACK_DIR) -> List[str]:
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.startswith('feedback-') and name.endswith('.jsonl')
+        )
+
+    def _current_segment(self) -> str:
+        segments = self.segments(self.directory)
+        if segments and os.path.getsize(segments[-1]) < self.segment_bytes:
+            return segments[-1]
+        index = int(os.path.basename(segments[-1])[9:-6]) + 1 if segments else 1
+        return os.path.join(self.directory, f"feedback-{index:06d}.jsonl")
+
+    def submit(self, entry: dict) -> bool:
+        """Queue an entry without waiting; drops it if the backlog is full"""
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Feedback queue full, dropping entry")
+            return False
+
+    def write_batch(self, batch: List[dict]):
+        """Append a batch with a single fsync, rotating on segment size"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._current_segment(), 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in batch))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _drain(self, batch: List[dict]) -> List[dict]:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def run(self):
+        """Background writer: batch whatever is queued and write it off the event loop"""
+        loop = asyncio.get_running_loop()
+        backoff = 1
+        while True:
+            if not self.failed_batch:
+                self.failed_batch = self._drain([await self.queue.get()])
+            try:
+                await loop.run_in_executor(None, self.write_batch, self.failed_batch)
+            except Exception as e:
+                # Keep the batch and retry; accepted feedback is never discarded
+                logger.error("Error writing feedback batch, retrying in %ss: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+                continue
+            self.failed_batch = []
+            backoff = 1
+
+    def flush(self):
+        """Synchronously write anything still queued (used at shutdown)"""
+        if self.failed_batch:
+            self.write_batch(self.failed_batch)
+            self.failed_batch = []
+        while not self.queue.empty():
+            self.write_batch(self._drain([]))
+
+    @classmethod
+    def read(cls, directory: str = FEEDBACK_DIR):
+        """Yield every stored entry, oldest first"""
+        for path in cls.segments(directory):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+def export_feedback(argv: List[str]):
+    """Small CLI to read or export stored feedback"""
+    import argparse
+    import csv
+    import sys
+
+    parser = argparse.ArgumentParser(prog='app.py feedback', description='Export stored feedback')
+    parser.add_argument('--dir', default=FEEDBACK_DIR, help='feedback log directory')
+    parser.add_argument('--since', help='only entries at or after this ISO timestamp')
+    parser.add_argument('--type', help='only entries of this feedback type')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    args = parser.parse_args(argv)
+
+    entries = (
+        entry for entry in FeedbackLog.read(args.dir)
+        if (not args.since or entry.get('timestamp', '') >= args.since)
+        and (not args.type or entry.get('type') == args.type)
+    )
+
+    if args.format == 'csv':
+        writer = csv.DictWriter(
+            sys.stdout, fieldnames=['timestamp', 'type', 'user_id', 'feedback'],
+            extrasaction='ignore'
+        )
+        writer.writeheader()
+        writer.writerows(entries)
+    else:
+        for entry in entries:
+            sys.stdout.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
 class MovieBot:
     def __init__(self):
-        self.application = Application.builder().token(TELEGRAM_TOKEN).build()
+        constructed = time.perf_counter()
+        self.startup_phases = {'imports': IMPORT_SECONDS}
+        self.ready = False
+        self.tracer = Tracer()
+        self.application = (
+            Application.builder()
+            .token(TELEGRAM_TOKEN)
+            .request(TracedRequest(self.tracer, connection_pool_size=256))
+            .persistence(PicklePersistence(filepath=USER_STATE_PATH))
+            .build()
+        )
         self.user_data = {}  # Store user preferences and history
+        self.tmdb_scheduler = TmdbScheduler()
+        self.tmdb_circuit = CircuitBreaker()
+        self.overload = OverloadController(
+            lambda: self.application.update_queue.qsize(), self.tmdb_circuit
+        )
+        self.similarity = SimilarityIndex()
+        self.season_tables = SeasonTableCache()
+        self.tmdb_cache = TmdbCache()
+        self.card_cache = RenderedCardCache()
+        self.watchers = WatcherIndex({})  # Rebound to persisted bot_data on startup
+        self.feedback_log = FeedbackLog()
+        self.watchlist_shares = WatchlistShares()
+        self.tmdb_cache.listeners.append(self.card_cache.invalidate)
+        self.tmdb_cache.listeners.append(self.season_tables.invalidate)
+        self.change_feed = ChangeFeedWorker(
+            lambda endpoint, params: self.fetch_tmdb_data(
+                endpoint, params, priority='batch', cache=False
+            ),
+            self.apply_tmdb_changes
+        )
+        self.poster_file_ids: Dict[str, str] = {}  # Poster URL -> Telegram file_id
+        self.background_tasks = []  # Endless loops cancelled at shutdown
         self.setup_handlers()
+        self.startup_phases['construct'] = time.perf_counter() - constructed
 
     def setup_handlers(self):
         # Command handlers
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("trending", self.trending_command))
-        self.application.add_handler(CommandHandler("upcoming", self.upcoming_command))
-        self.application.add_handler(CommandHandler("nowplaying", self.now_playing_command))
-        self.application.add_handler(CommandHandler("mylist", self.my_list_command))
-        self.application.add_handler(CommandHandler("settings", self.settings_command))
-        self.application.add_handler(CommandHandler("feedback", self.handle_feedback))
-        self.application.add_handler(CommandHandler("guide", self.show_user_guide))
-        self.application.add_handler(CommandHandler("share", self.share_watchlist))
+        self.application.add_handler(CommandHandler("start", self.handler(self.start_command)))
+        self.application.add_handler(CommandHandler("help", self.handler(self.help_command)))
+        self.application.add_handler(CommandHandler("trending", self.handler(self.trending_command)))
+        self.application.add_handler(CommandHandler("upcoming", self.handler(self.upcoming_command)))
+        self.application.add_handler(CommandHandler("nowplaying", self.handler(self.now_playing_command)))
+        self.application.add_handler(CommandHandler("mylist", self.handler(self.my_list_command)))
+        self.application.add_handler(CommandHandler("settings", self.handler(self.settings_command)))
+        self.application.add_handler(CommandHandler("feedback", self.handler(self.handle_feedback)))
+        self.application.add_handler(CommandHandler("guide", self.handler(self.show_user_guide)))
+        self.application.add_handler(CommandHandler("share", self.handler(self.share_watchlist)))
 
         # Callback query handler
-        self.application.add_handler(CallbackQueryHandler(self.handle_callback))
+        self.application.add_handler(CallbackQueryHandler(self.handler(self.handle_callback)))
 
         # Message handler
         self.application.add_handler(MessageHandler(
             filters.TEXT & ~filters.COMMAND, 
-            self.handle_search
+            self.handler(self.handle_search)
         ))
 
         # Inline query handler
-        self.application.add_handler(InlineQueryHandler(self.handle_inline_query))
+        self.application.add_handler(InlineQueryHandler(self.handler(self.handle_inline_query)))
 
         # Error handler
         self.application.add_error_handler(self.error_handler)
 
+    def handler(self, callback):
+        """Wrap an update handler with load shedding and tracing"""
+        return self.shed_load(self.traced(callback))
+
+    def shed_load(self, callback):
+        """Count each update at the current degradation level and reject it at the last one"""
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            if self.overload.admit() == len(OverloadController.LEVELS) - 1:
+                await self.reply_busy(update)
+                return
+            return await callback(update, context)
+        return wrapper
+
+    def traced(self, callback):
+        """Wrap a handler with sampled end to end tracing"""
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            detail = update.callback_query.data if update.callback_query else ''
+            with self.tracer.trace(callback.__name__, detail):
+                return await callback(update, context)
+        return wrapper
+
+    async def reply_busy(self, update: Update):
+        """Cheapest possible answer while shedding load"""
+        busy_text = "⏳ The bot is busy right now. Please try again in a moment."
+        try:
+            if update.callback_query:
+                await update.callback_query.answer(busy_text)
+            elif update.inline_query:
+                await update.inline_query.answer([], cache_time=5)
+            elif update.effective_message:
+                await update.effective_message.reply_text(busy_text)
+        except Exception as e:
+            logger.error("Error sending busy reply: %s", e)
+
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
         welcome_text = (
@@ -154,26 +1298,48 @@ class MovieBot:
             }
             context.user_data['initialized'] = True
 
-    async def fetch_tmdb_data(self, endpoint: str, params: dict = None) -> dict:
+    async def fetch_tmdb_data(self, endpoint: str, params: dict = None,
+                              priority: str = 'interactive', cache: bool = True) -> dict:
         if params is None:
             params = {}
+
+        if cache:
+            cached = self.tmdb_cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+
+        # Fail fast while TMDB is down or we are serving from cache only
+        if not self.tmdb_circuit.allow() or self.overload.degraded(3):
+            return {"results": []}
         params['api_key'] = TMDB_API_KEY
+
+        # Wait for our share of the API key's rate budget
+        with self.tracer.span('tmdb.queue'):
+            await self.tmdb_scheduler.acquire(priority)
         
         timeout = aiohttp.ClientTimeout(total=10)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(f"{TMDB_BASE_URL}{endpoint}", params=params) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.error(f"TMDB API error: {response.status} - {await response.text()}")
-                        return {"results": []}
+            with self.tracer.span(f"tmdb {endpoint}"):
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.get(f"{TMDB_BASE_URL}{endpoint}", params=params) as response:
+                        if response.status == 200:
+                            payload = await response.json()
+                            self.tmdb_circuit.record_success()
+                            if cache:
+                                self.tmdb_cache.put(endpoint, params, payload)
+                            return payload
+                        else:
+                            if response.status >= 500 or response.status == 429:
+                                self.tmdb_circuit.record_failure()
+                            logger.error("TMDB API error: %s - %s", response.status, await response.text())
+                            return {"results": []}
         except Exception as e:
-            logger.error(f"Error fetching TMDB data: {e}")
+            self.tmdb_circuit.record_failure()
+            logger.error("Error fetching TMDB data: %s", e)
             return {"results": []}
 
-    async def format_movie_details(self, movie_data: dict) -> tuple:
-        """Format movie details with rich content"""
+    async def format_movie_details(self, movie_data: dict, enrich: bool = True) -> tuple:
+        """Format movie details with rich content; enrich=False skips credits and trailer"""
         title = movie_data.get('title') or movie_data.get('name', 'N/A')
         release_date = movie_data.get('release_date') or movie_data.get('first_air_date', 'N/A')
         rating = movie_data.get('vote_average', 0)
@@ -183,7 +1349,7 @@ class MovieBot:
         
         # Get credits
         movie_id = movie_data.get('id')
-        credits = await self.fetch_tmdb_data(f"/movie/{movie_id}/credits")
+        credits = await self.fetch_tmdb_data(f"/movie/{movie_id}/credits") if enrich else {}
         
         # Get director and cast
         director = next((crew['name'] for crew in credits.get('crew', []) 
@@ -191,7 +1357,7 @@ class MovieBot:
         cast = [actor['name'] for actor in credits.get('cast', [])[:3]]
         
         # Get trailer
-        videos = await self.fetch_tmdb_data(f"/movie/{movie_id}/videos")
+        videos = await self.fetch_tmdb_data(f"/movie/{movie_id}/videos") if enrich else {}
         trailer = next((video for video in videos.get('results', []) 
                        if video['type'] == 'Trailer'), None)
         
@@ -264,6 +1430,8 @@ class MovieBot:
                 await self.show_movie_details(query, context)
             elif data.startswith('tv_'):
                 await self.show_tv_details(query, context)
+            elif data.startswith('seasons_'):
+                await self.handle_season_page(query, context)
             elif data.startswith('season_'):
                 await self.handle_season_selection(query, context)
             elif data.startswith('episode_'):
@@ -279,43 +1447,59 @@ class MovieBot:
             elif data.startswith('menu_'):
                 await self.handle_menu_selection(query, context)
         except Exception as e:
-            logger.error(f"Error handling callback: {e}")
+            logger.error("Error handling callback: %s", e)
             await query.answer("An error occurred. Please try again.")
 
     async def show_movie_details(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
         """Show detailed movie information with enhanced formatting"""
         movie_id = query.data.split('_')[1]
-        movie_data = await self.fetch_tmdb_data(f"/movie/{movie_id}")
-        
-        if not movie_data:
-            await query.answer("Movie information not available")
-            return
+        language = self.user_language(context)
+        params = {"language": language}
+
+        # Reuse the rendered card while its TMDB entry is still fresh
+        card = self.card_cache.get('movie', movie_id, language)
+        if card is None or self.tmdb_cache.get(f"/movie/{movie_id}", params) is None:
+            movie_data = await self.fetch_tmdb_data(f"/movie/{movie_id}", params)
+
+            if not movie_data.get('id'):
+                await query.answer("Movie information not available")
+                return
+
+            # Get poster image
+            poster_path = movie_data.get('poster_path')
+            if poster_path:
+                poster_url = f"{TMDB_IMAGE_BASE_URL}{poster_path}"
+            else:
+                poster_url = "https://via.placeholder.com/500x750.png?text=No+Poster+Available"
 
-        # Get poster image
-        poster_path = movie_data.get('poster_path')
-        if poster_path:
-            poster_url = f"{TMDB_IMAGE_BASE_URL}{poster_path}"
-        else:
-            poster_url = "https://via.placeholder.com/500x750.png?text=No+Poster+Available"
+            enrich = not self.overload.degraded(1)
+            with self.tracer.span('render.movie_card'):
+                message, buttons = await self.format_movie_details(movie_data, enrich)
+                card = (poster_url, message, 'Markdown', InlineKeyboardMarkup(buttons))
+            # Degraded cards are not worth keeping
+            if enrich:
+                self.card_cache.put('movie', movie_id, language, card)
 
-        message, buttons = await self.format_movie_details(movie_data)
-        reply_markup = InlineKeyboardMarkup(buttons)
+        poster_url, message, parse_mode, reply_markup = card
 
         try:
-            # Send poster image with caption
-            await query.message.reply_photo(
-                photo=poster_url,
-                caption=message,
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
-            )
-            await query.message.delete()
+            if self.overload.degraded(2):
+                # Text only: no poster upload and no delete
+                await query.message.reply_text(
+                    message,
+                    reply_markup=reply_markup,
+                    parse_mode=parse_mode
+                )
+            else:
+                # Send poster image with caption, reusing Telegram's copy when we have one
+                await self.send_poster(query, poster_url, message, reply_markup, parse_mode)
+                await query.message.delete()
         except Exception as e:
-            logger.error(f"Error sending movie details: {e}")
+            logger.error("Error sending movie details: %s", e)
             await query.message.reply_text(
                 message,
                 reply_markup=reply_markup,
-                parse_mode='Markdown'
+                parse_mode=parse_mode
             )
 
         # Track user interaction
@@ -326,6 +1510,48 @@ class MovieBot:
             'timestamp': datetime.now().isoformat()
         })
 
+        # Have the Similar button ready before the user taps it, unless we are shedding load
+        if movie_id not in self.similarity.neighbors and self.overload.level == 0:
+            self.application.create_task(self.precompute_similar(movie_id, 'prefetch'))
+
+    async def precompute_similar(self, movie_id: str, priority: str = 'prefetch'):
+        """Fetch TMDB similarity data for a title and index its neighbours"""
+        movie_data = await self.fetch_tmdb_data(
+            f"/movie/{movie_id}",
+            {"append_to_response": "credits,similar,recommendations"},
+            priority=priority
+        )
+        if movie_data.get('id'):
+            self.similarity.build(movie_data)
+
+    async def show_similar_content(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
+        """Show precomputed similar movies"""
+        movie_id = query.data.split('_')[1]
+
+        neighbors = self.similarity.similar(movie_id)
+        if neighbors is None:
+            # Not indexed yet, build it once now
+            await self.precompute_similar(movie_id, 'interactive')
+            neighbors = self.similarity.similar(movie_id)
+
+        if not neighbors:
+            await query.answer("No similar movies found")
+            return
+
+        title = self.similarity.titles.get(movie_id, 'this movie')
+        keyboard = [
+            [InlineKeyboardButton(f"{name}", callback_data=f"movie_{neighbor_id}")]
+            for neighbor_id, name in neighbors
+        ]
+        reply_markup = InlineKeyboardMarkup(keyboard)
+
+        await query.answer()
+        await query.message.reply_text(
+            f"🔄 *Similar to {title}:*",
+            reply_markup=reply_markup,
+            parse_mode='Markdown'
+        )
+
     async def handle_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Enhanced search handler with auto-complete and suggestions"""
         search_query = update.message.text
@@ -378,44 +1604,107 @@ class MovieBot:
     async def show_tv_details(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
         """Show detailed TV show information with seasons and episodes"""
         tv_id = query.data.split('_')[1]
-        tv_data = await self.fetch_tmdb_data(f"/tv/{tv_id}")
-        
-        if not tv_data:
+        card = await self.tv_card(tv_id, context)
+        if card is None:
             await query.answer("TV show information not available")
             return
+        poster_url, message, parse_mode, reply_markup = card
 
-        # Get poster and backdrop
-        poster_path = tv_data.get('poster_path')
-        poster_url = f"{TMDB_IMAGE_BASE_URL}{poster_path}" if poster_path else None
-        
-        # Format basic show information
-        title = tv_data.get('name', 'N/A')
-        first_air_date = tv_data.get('first_air_date', 'N/A')
-        rating = tv_data.get('vote_average', 0)
-        seasons_count = tv_data.get('number_of_seasons', 0)
-        episodes_count = tv_data.get('number_of_episodes', 0)
-        genres = [genre['name'] for genre in tv_data.get('genres', [])]
-        
-        message = (
-            f"📺 *{title}*\n\n"
-            f"📅 First Aired: {first_air_date}\n"
-            f"⭐ Rating: {rating}/10\n"
-            f"🎬 Seasons: {seasons_count}\n"
-            f"episodes: {episodes_count}\n"
-            f"🎭 Genres: {', '.join(genres)}\n\n"
-            f"📝 *Overview:*\n{tv_data.get('overview', 'No overview available.')}\n\n"
-            f"Select a season to view episodes:"
-        )
+        try:
+            if poster_url and not self.overload.degraded(2):
+                await self.send_poster(query, poster_url, message, reply_markup, parse_mode)
+                await query.message.delete()
+            else:
+                await self.edit_message(query, message, reply_markup, parse_mode)
+        except Exception as e:
+            logger.error("Error sending TV show details: %s", e)
+            await query.answer("Error displaying TV show details")
+
+    async def tv_card(self, tv_id: str, context: ContextTypes.DEFAULT_TYPE) -> Optional[tuple]:
+        """Rendered (poster, caption, parse mode, keyboard) for a show, or None if unavailable"""
+        language = self.user_language(context)
+        params = {"language": language}
+
+        # Reuse the rendered card while its TMDB entry is still fresh
+        card = self.card_cache.get('tv', tv_id, language)
+        if card is None or self.tmdb_cache.get(f"/tv/{tv_id}", params) is None:
+            tv_data = await self.fetch_tmdb_data(f"/tv/{tv_id}", params)
+
+            if not tv_data.get('id'):
+                return None
+
+            # Get poster and backdrop
+            poster_path = tv_data.get('poster_path')
+            poster_url = f"{TMDB_IMAGE_BASE_URL}{poster_path}" if poster_path else None
+
+            # Format basic show information
+            title = tv_data.get('name', 'N/A')
+            first_air_date = tv_data.get('first_air_date', 'N/A')
+            rating = tv_data.get('vote_average', 0)
+            seasons_count = tv_data.get('number_of_seasons', 0)
+            episodes_count = tv_data.get('number_of_episodes', 0)
+            genres = [genre['name'] for genre in tv_data.get('genres', [])]
+
+            message = (
+                f"📺 *{title}*\n\n"
+                f"📅 First Aired: {first_air_date}\n"
+                f"⭐ Rating: {rating}/10\n"
+                f"🎬 Seasons: {seasons_count}\n"
+                f"episodes: {episodes_count}\n"
+                f"🎭 Genres: {', '.join(genres)}\n\n"
+                f"📝 *Overview:*\n{tv_data.get('overview', 'No overview available.')}\n\n"
+                f"Select a season to view episodes:"
+            )
+
+            with self.tracer.span('render.tv_keyboard'):
+                reply_markup = InlineKeyboardMarkup(self.tv_keyboard(tv_id, seasons_count))
+            card = (poster_url, message, 'Markdown', reply_markup)
+            self.card_cache.put('tv', tv_id, language, card)
+        return card
+
+    async def edit_message(self, query: CallbackQuery, text: str,
+                           reply_markup: InlineKeyboardMarkup, parse_mode: str):
+        """Edit a text or photo message in place, falling back to a new message"""
+        if not query.message.photo:
+            await query.message.edit_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        elif len(text) <= 1024:
+            # Photo captions are capped at 1024 characters
+            await query.message.edit_caption(
+                caption=text, reply_markup=reply_markup, parse_mode=parse_mode
+            )
+        else:
+            await query.message.reply_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+
+    def tv_keyboard(self, tv_id: str, seasons_count: int, page: int = 0) -> List:
+        """Season grid for one page plus the show's action buttons"""
+        start = page * SEASONS_PER_PAGE
+        seasons = range(start + 1, min(start + SEASONS_PER_PAGE, seasons_count) + 1)
 
-        # Create season selection buttons
         keyboard = []
-        for season in range(1, seasons_count + 1):
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"Season {season}",
-                    callback_data=f"season_{tv_id}_{season}"
-                )
-            ])
+        row = []
+        for season in seasons:
+            row.append(InlineKeyboardButton(
+                f"S{season}",
+                callback_data=f"season_{tv_id}_{season}_0_{seasons_count}"
+            ))
+            if len(row) == SEASON_GRID_COLUMNS:
+                keyboard.append(row)
+                row = []
+        if row:
+            keyboard.append(row)
+
+        # The season count travels in the callback so paging needs no refetch
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton(
+                "⬅️ Previous", callback_data=f"seasons_{tv_id}_{seasons_count}_{page-1}"
+            ))
+        if start + SEASONS_PER_PAGE < seasons_count:
+            nav_buttons.append(InlineKeyboardButton(
+                "➡️ Next", callback_data=f"seasons_{tv_id}_{seasons_count}_{page+1}"
+            ))
+        if nav_buttons:
+            keyboard.append(nav_buttons)
 
         # Add action buttons
         action_buttons = [
@@ -424,97 +1713,95 @@ class MovieBot:
             InlineKeyboardButton("📤 Share", callback_data=f"share_tv_{tv_id}")
         ]
         keyboard.append(action_buttons)
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        return keyboard
 
-        try:
-            if poster_url:
-                await query.message.reply_photo(
-                    photo=poster_url,
-                    caption=message,
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown'
-                )
-                await query.message.delete()
-            else:
-                await query.message.edit_text(
-                    message,
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown'
-                )
-        except Exception as e:
-            logger.error(f"Error sending TV show details: {e}")
-            await query.answer("Error displaying TV show details")
+    async def handle_season_page(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
+        """Show one page of the season grid in place, also when coming back from a season"""
+        _, tv_id, seasons_count, page = query.data.split('_')
+        card = await self.tv_card(tv_id, context)
+        if card is None:
+            await query.answer("TV show information not available")
+            return
+        await query.answer()
+        _, message, parse_mode, _ = card
+        reply_markup = InlineKeyboardMarkup(self.tv_keyboard(tv_id, int(seasons_count), int(page)))
+        await self.edit_message(query, message, reply_markup, parse_mode)
 
     async def handle_season_selection(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
         """Handle season selection with episode list"""
-        _, show_id, season_number = query.data.split('_')
-        
-        # Fetch season details
-        season_data = await self.fetch_tmdb_data(
-            f"/tv/{show_id}/season/{season_number}"
-        )
-        
-        if not season_data:
-            await query.answer("Season information not available")
-            return
+        parts = query.data.split('_')
+        show_id, season_number = parts[1], parts[2]
+        page = int(parts[3]) if len(parts) > 3 else 0
+        # Buttons rendered before the season count was encoded only carry show and season
+        seasons_count = parts[4] if len(parts) > 4 else None
+        count_suffix = f"_{seasons_count}" if seasons_count else ""
+
+        # Episode tables are cached, so paging never goes back to TMDB
+        table = self.season_tables.get(show_id, season_number)
+        if table is None:
+            season_data = await self.fetch_tmdb_data(
+                f"/tv/{show_id}/season/{season_number}"
+            )
+            if not season_data.get('episodes'):
+                await query.answer("Season information not available")
+                return
+            table = self.season_tables.put(show_id, season_number, season_data)
+
+        air_date, episodes = table
 
         # Format season information
         message = (
             f"📺 *Season {season_number}*\n"
-            f"📅 Air Date: {season_data.get('air_date', 'N/A')}\n"
-            f"episodes: {len(season_data.get('episodes', []))}\n\n"
+            f"📅 Air Date: {air_date}\n"
+            f"episodes: {len(episodes)}\n\n"
             f"Select an episode:"
         )
 
         # Create episode selection buttons with pagination
-        episodes = season_data.get('episodes', [])
         keyboard = []
+        start_idx = page * EPISODES_PER_PAGE
+        end_idx = start_idx + EPISODES_PER_PAGE
         
-        # Show episodes in groups of 5
-        page = context.user_data.get('episode_page', 0)
-        start_idx = page * 5
-        end_idx = start_idx + 5
-        
-        for episode in episodes[start_idx:end_idx]:
-            episode_num = episode.get('episode_number')
-            episode_name = episode.get('name', f'Episode {episode_num}')
+        for episode_num, episode_name in episodes[start_idx:end_idx]:
             keyboard.append([
                 InlineKeyboardButton(
                     f"Ep {episode_num}: {episode_name}",
-                    callback_data=f"episode_{show_id}_{season_number}_{episode_num}"
+                    callback_data=f"episode_{show_id}_{season_number}_{episode_num}{count_suffix}"
                 )
             ])
 
         # Add navigation buttons if needed
         nav_buttons = []
         if page > 0:
-            nav_buttons.append(
-                InlineKeyboardButton("⬅️ Previous", callback_data=f"page_{page-1}")
-            )
+            nav_buttons.append(InlineKeyboardButton(
+                "⬅️ Previous",
+                callback_data=f"season_{show_id}_{season_number}_{page-1}{count_suffix}"
+            ))
         if end_idx < len(episodes):
-            nav_buttons.append(
-                InlineKeyboardButton("➡️ Next", callback_data=f"page_{page+1}")
-            )
+            nav_buttons.append(InlineKeyboardButton(
+                "➡️ Next",
+                callback_data=f"season_{show_id}_{season_number}_{page+1}{count_suffix}"
+            ))
         if nav_buttons:
             keyboard.append(nav_buttons)
 
-        # Add back button
+        # Back to the grid page holding this season, edited in place
+        if seasons_count:
+            season_page = (int(season_number) - 1) // SEASONS_PER_PAGE
+            back_data = f"seasons_{show_id}_{seasons_count}_{season_page}"
+        else:
+            back_data = f"tv_{show_id}"
         keyboard.append([
-            InlineKeyboardButton("🔙 Back to Seasons", callback_data=f"tv_{show_id}")
+            InlineKeyboardButton("🔙 Back to Seasons", callback_data=back_data)
         ])
 
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.message.edit_text(
-            message,
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
+        await self.edit_message(query, message, reply_markup, 'Markdown')
 
     async def handle_episode_selection(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
         """Handle episode selection and show streaming sources"""
-        _, show_id, season_number, episode_number = query.data.split('_')
+        _, show_id, season_number, episode_number, *seasons_count = query.data.split('_')
         
         # Fetch episode details
         episode_data = await self.fetch_tmdb_data(
@@ -544,49 +1831,140 @@ class MovieBot:
         
         keyboard = [source_buttons]
         
-        # Add navigation buttons
+        # Add navigation buttons, returning to the page this episode is on
+        episode_page = (int(episode_number) - 1) // EPISODES_PER_PAGE
         keyboard.append([
             InlineKeyboardButton(
                 "🔙 Back to Episodes",
-                callback_data=f"season_{show_id}_{season_number}"
+                callback_data="_".join(
+                    ["season", show_id, season_number, str(episode_page), *seasons_count]
+                )
             )
         ])
 
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.message.edit_text(
-            message,
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
+        await self.edit_message(query, message, reply_markup, 'Markdown')
 
     async def handle_like(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
         """Handle like button interactions"""
-        content_id = query.data.split('_')[1]
+        content_id = self.parse_content_id(query.data)
         
         if 'liked_content' not in context.user_data:
             context.user_data['liked_content'] = set()
             
+        saved_before = self.saved_items(context)
         if content_id in context.user_data['liked_content']:
             context.user_data['liked_content'].remove(content_id)
             await query.answer("Removed from liked content!")
         else:
             context.user_data['liked_content'].add(content_id)
             await query.answer("Added to liked content!")
+        self.update_co_saves(content_id, saved_before, context)
 
     async def handle_save(self, query: CallbackQuery, context: ContextTypes.DEFAULT_TYPE):
         """Handle save to watchlist functionality"""
-        content_id = query.data.split('_')[1]
+        content_id = self.parse_content_id(query.data)
+        user_id = query.from_user.id
         
-        if 'watchlist' not in context.user_data:
-            context.user_data['watchlist'] = set()
+        # /start initialises the watchlist as a list
+        context.user_data['watchlist'] = set(context.user_data.get('watchlist', []))
             
+        saved_before = self.saved_items(context)
         if content_id in context.user_data['watchlist']:
             context.user_data['watchlist'].remove(content_id)
+            self.watchers.remove(content_id, user_id)
+            self.watchlist_shares.invalidate(user_id)
+            self.update_co_saves(content_id, saved_before, context)
             await query.answer("Removed from watchlist!")
         else:
             context.user_data['watchlist'].add(content_id)
-            await query.answer("Added to watchlist!")
+            self.update_co_saves(content_id, saved_before, context)
+            self.watchers.add(content_id, user_id)
+            self.watchlist_shares.invalidate(user_id)
+            saved_by = self.watchers.count(content_id)
+            await query.answer(
+                f"Added to watchlist! {saved_by:,} cinephiles saved this"
+                if saved_by > 1 else "Added to watchlist!"
+            )
+
+    @staticmethod
+    def parse_content_id(data: str) -> str:
+        """Saved content key: 'save_123' -> '123' (movie), 'save_tv_123' -> 'tv_123'"""
+        return data.split('_', 1)[1]
+
+    @staticmethod
+    def content_endpoint(content_id: str) -> str:
+        """TMDB details endpoint for a saved content key"""
+        if content_id.startswith('tv_'):
+            return f"/tv/{content_id[3:]}"
+        return f"/movie/{content_id}"
+
+    def update_co_saves(self, content_id: str, saved_before: set,
+                        context: ContextTypes.DEFAULT_TYPE):
+        """Count co-saves only when a title enters or leaves the combined saved/liked set"""
+        saved_after = self.saved_items(context)
+        if content_id in saved_after and content_id not in saved_before:
+            self.similarity.add_co_save(content_id, saved_after)
+        elif content_id in saved_before and content_id not in saved_after:
+            self.similarity.add_co_save(content_id, saved_after, -1)
+
+    def apply_tmdb_changes(self, media_type: str, item_ids: set):
+        """Evict changed titles everywhere and refetch the ones that were hot"""
+        dropped = self.tmdb_cache.invalidate_titles(media_type, item_ids)
+        for item_id in item_ids:
+            if media_type == 'movie':
+                self.similarity.forget(item_id)
+            # Shared watchlists showing this title are re-rendered on next share
+            content_id = item_id if media_type == 'movie' else f"tv_{item_id}"
+            for user_id in self.watchers.watchers(content_id):
+                self.watchlist_shares.invalidate(user_id)
+
+        for endpoint, params in dropped:
+            self.application.create_task(
+                self.fetch_tmdb_data(endpoint, dict(params), priority='batch')
+            )
+        if dropped:
+            logger.info("TMDB change feed refreshed %s cached %s responses", len(dropped), media_type)
+
+    async def send_poster(self, query, poster_url: str, caption: str, reply_markup, parse_mode):
+        """Reply with the poster, reusing Telegram's copy and falling back to the URL if it is rejected"""
+        file_id = self.poster_file_ids.get(poster_url)
+        sent = None
+        if file_id:
+            try:
+                sent = await query.message.reply_photo(
+                    photo=file_id,
+                    caption=caption,
+                    reply_markup=reply_markup,
+                    parse_mode=parse_mode
+                )
+            except BadRequest as e:
+                logger.warning("Cached poster file_id rejected, resending from URL: %s", e)
+                self.poster_file_ids.pop(poster_url, None)
+        if sent is None:
+            sent = await query.message.reply_photo(
+                photo=poster_url,
+                caption=caption,
+                reply_markup=reply_markup,
+                parse_mode=parse_mode
+            )
+        self.remember_poster(poster_url, sent)
+        return sent
+
+    def remember_poster(self, poster_url: str, message):
+        """Keep the uploaded poster's file_id so later sends skip the download"""
+        if message and message.photo:
+            self.poster_file_ids[poster_url] = message.photo[-1].file_id
+
+    def user_language(self, context: ContextTypes.DEFAULT_TYPE) -> str:
+        """Preferred TMDB language for this user"""
+        return context.user_data.get('preferences', {}).get('language', 'en')
+
+    def saved_items(self, context: ContextTypes.DEFAULT_TYPE) -> set:
+        """Everything the user has saved or liked"""
+        return (set(context.user_data.get('watchlist', []))
+                | set(context.user_data.get('liked_content', [])))
 
     async def web_app(self):
         """Create web application with health check and metrics"""
@@ -594,6 +1972,7 @@ class MovieBot:
         app.router.add_get('/', self.handle_root)
         app.router.add_get('/health', self.handle_health)
         app.router.add_get('/metrics', self.handle_metrics)
+        app.router.add_get('/traces', self.handle_traces)
         return app
 
     async def handle_root(self, _):
@@ -602,13 +1981,19 @@ class MovieBot:
 
     async def handle_health(self, request):
         """Handle health check endpoint"""
+        # Only report ready once caches are warm
+        if not self.ready:
+            return web.Response(text="WARMING UP", status=503)
         return web.Response(text="OK", status=200)
 
     async def handle_metrics(self, request):
         """Handle metrics endpoint"""
         metrics = {
-            "users": len(self.user_data),
+            "users": len(self.application.user_data),
             "uptime": str(datetime.now() - self.start_time),
+            "tmdb_queue": self.tmdb_scheduler.stats(),
+            "overload": self.overload.stats(),
+            "startup": {phase: round(seconds, 3) for phase, seconds in self.startup_phases.items()},
             "status": "healthy"
         }
         return web.Response(
@@ -616,6 +2001,17 @@ class MovieBot:
             content_type='application/json'
         )
 
+    async def handle_traces(self, request):
+        """Slowest sampled update traces, slowest first"""
+        traces = {
+            "sample_rate": self.tracer.sample_rate,
+            "slowest": self.tracer.report()
+        }
+        return web.Response(
+            text=json.dumps(traces),
+            content_type='application/json'
+        )
+
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Send help message when command /help is issued."""
         help_text = (
@@ -698,11 +2094,13 @@ class MovieBot:
         keyboard = []
         for item_id in context.user_data['watchlist']:
             # Fetch item details from TMDB
-            item_data = await self.fetch_tmdb_data(f"/movie/{item_id}")
-            if item_data:
+            item_data = await self.fetch_tmdb_data(self.content_endpoint(item_id))
+            title = item_data.get('title') or item_data.get('name')
+            if title:
+                callback_data = item_id if item_id.startswith('tv_') else f"movie_{item_id}"
                 keyboard.append([InlineKeyboardButton(
-                    f"{item_data['title']}", 
-                    callback_data=f"movie_{item_id}"
+                    f"{title}", 
+                    callback_data=callback_data
                 )])
         
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -726,6 +2124,15 @@ class MovieBot:
         if not query:
             return
 
+        # Shared watchlists are answered straight from memory
+        if query.startswith(SHARE_PREFIX):
+            share = self.watchlist_shares.get(query[len(SHARE_PREFIX):])
+            if share is not None:
+                await update.inline_query.answer(share[2], cache_time=SHARE_CACHE_TIME)
+            else:
+                await update.inline_query.answer([], cache_time=5)
+            return
+
         results = []
         search_results = await self.fetch_tmdb_data(
             "/search/multi",
@@ -758,7 +2165,12 @@ class MovieBot:
 
     async def error_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle errors in the bot"""
-        logger.error(f"Update {update} caused error {context.error}")
+        error = getattr(context, 'error', None)
+        logger.error(
+            "Update caused error: %r", error,
+            exc_info=error if isinstance(error, BaseException) else None,
+            extra={'update': self.summarize_update(update)}
+        )
         
         error_message = "An error occurred while processing your request. Please try again later."
         
@@ -769,7 +2181,25 @@ class MovieBot:
                     parse_mode='Markdown'
                 )
         except Exception as e:
-            logger.error(f"Error sending error message: {e}")
+            logger.error("Error sending error message: %s", e)
+
+    @staticmethod
+    def summarize_update(update) -> Optional[dict]:
+        """A few identifying fields instead of the full Update repr"""
+        if not isinstance(update, Update):
+            return None
+        summary = {'update_id': update.update_id}
+        if update.effective_user:
+            summary['user_id'] = update.effective_user.id
+        if update.effective_chat:
+            summary['chat_id'] = update.effective_chat.id
+        if update.callback_query:
+            summary['callback_data'] = update.callback_query.data
+        elif update.inline_query:
+            summary['inline_query'] = update.inline_query.query[:64]
+        elif update.effective_message and update.effective_message.text:
+            summary['text'] = update.effective_message.text[:64]
+        return summary
 
     async def send_rich_media_message(self, update: Update, content_type: str, content_data: dict):
         """Send enhanced messages with rich media content"""
@@ -798,7 +2228,7 @@ class MovieBot:
                     parse_mode='Markdown'
                 )
         except Exception as e:
-            logger.error(f"Error sending rich media: {e}")
+            logger.error("Error sending rich media: %s", e)
             await self.error_handler(update, None)
 
     async def handle_feedback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -816,8 +2246,8 @@ class MovieBot:
             'type': context.user_data.get('feedback_type', 'general')
         }
         
-        # Store feedback in database (implement your database logic here)
-        # self.db.store_feedback(feedback_entry)
+        # Queued for the background writer, never awaited here
+        self.feedback_log.submit(feedback_entry)
         
         await update.message.reply_text(
             "Thank you for your feedback! We appreciate your help in improving our service.",
@@ -829,44 +2259,61 @@ class MovieBot:
     async def setup_notifications(self):
         """Setup periodic notifications for users"""
         async def check_and_send_notifications():
-            for user_id, user_data in self.user_data.items():
-                if user_data.get('preferences', {}).get('notifications', True):
-                    # Check for new releases in watchlist
-                    for movie_id in user_data.get('watchlist', []):
-                        movie_data = await self.fetch_tmdb_data(f"/movie/{movie_id}")
-                        release_date = datetime.strptime(
-                            movie_data.get('release_date', ''), 
-                            '%Y-%m-%d'
+            # One TMDB lookup per saved title, fanned out through the watcher index
+            for movie_id, watchers in list(self.watchers.store.items()):
+                # Release dates only apply to movies; TV saves are keyed tv_<id>
+                if not movie_id.isdigit():
+                    continue
+                movie_data = await self.fetch_tmdb_data(
+                    f"/movie/{movie_id}", priority='batch'
+                )
+                if not movie_data.get('release_date'):
+                    continue
+                release_date = datetime.strptime(movie_data['release_date'], '%Y-%m-%d')
+
+                if release_date - datetime.now() > timedelta(days=7):
+                    continue
+
+                for user_id in watchers:
+                    preferences = self.application.user_data.get(user_id, {}).get('preferences', {})
+                    if preferences.get('notifications', True):
+                        await self.application.bot.send_message(
+                            chat_id=user_id,
+                            text=f"🎬 Upcoming Release Alert!\n\n"
+                                 f"'{movie_data['title']}' is releasing on {release_date.strftime('%B %d, %Y')}!"
                         )
-                        
-                        if release_date and release_date - datetime.now() <= timedelta(days=7):
-                            await self.application.bot.send_message(
-                                chat_id=user_id,
-                                text=f"🎬 Upcoming Release Alert!\n\n"
-                                     f"'{movie_data['title']}' is releasing on {release_date.strftime('%B %d, %Y')}!"
-                            )
 
-        # Run notifications check every 24 hours
-        schedule.every(24).hours.do(lambda: asyncio.run(check_and_send_notifications()))
+        async def notification_loop():
+            while True:
+                await asyncio.sleep(24 * 3600)
+                try:
+                    await check_and_send_notifications()
+                except Exception as e:
+                    logger.error("Error sending release notifications: %s", e)
+
+        # Run notifications check every 24 hours on the application's loop
+        self.start_background(notification_loop())
 
     async def share_watchlist(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Share watchlist with other users"""
+        user_id = update.effective_user.id
         user_watchlist = context.user_data.get('watchlist', [])
         if not user_watchlist:
             await update.message.reply_text("Your watchlist is empty!")
             return
 
-        # Create shareable watchlist message
-        watchlist_text = "🎬 *My Cinephiles Watchlist*\n\n"
-        for movie_id in user_watchlist:
-            movie_data = await self.fetch_tmdb_data(f"/movie/{movie_id}")
-            if movie_data:
-                watchlist_text += f"• {movie_data['title']}\n"
+        # Render once; reused until the watchlist changes
+        share = self.watchlist_shares.for_user(user_id)
+        if share is None:
+            watchlist_text, results = await self.render_watchlist_share(user_watchlist)
+            token = self.watchlist_shares.put(user_id, watchlist_text, results)
+        else:
+            token, (_, watchlist_text, _) = share
 
         # Create share button
         share_button = InlineKeyboardButton(
             "Share Watchlist",
-            switch_inline_query=f"share_watchlist_{update.effective_user.id}"
+            switch_inline_query=f"{SHARE_PREFIX}{token}"
         )
         reply_markup = InlineKeyboardMarkup([[share_button]])
 
@@ -876,6 +2323,53 @@ class MovieBot:
             reply_markup=reply_markup
         )
 
+    async def render_watchlist_share(self, watchlist) -> tuple:
+        """Build the share message and its inline article set in one pass"""
+        # Fetched concurrently; the TMDB scheduler keeps us within budget
+        content_ids = list(watchlist)
+        payloads = await asyncio.gather(*(
+            self.fetch_tmdb_data(self.content_endpoint(content_id)) for content_id in content_ids
+        ))
+        items = [
+            (content_id, item, item.get('title') or item.get('name'))
+            for content_id, item in zip(content_ids, payloads)
+            if item.get('title') or item.get('name')
+        ]
+
+        watchlist_text = "🎬 *My Cinephiles Watchlist*\n\n"
+        watchlist_text += "".join(f"• {title}\n" for _, _, title in items)
+
+        results = [
+            InlineQueryResultArticle(
+                id="watchlist",
+                title="🎬 My Cinephiles Watchlist",
+                description=f"{len(items)} titles",
+                input_message_content=InputTextMessageContent(
+                    message_text=watchlist_text,
+                    parse_mode='Markdown'
+                )
+            )
+        ]
+        # The message lists every title; per-title articles stop at Telegram's result limit
+        for content_id, item, title in items[:SHARE_INLINE_TITLES]:
+            media_type = 'TV' if content_id.startswith('tv_') else 'MOVIE'
+            year = (item.get('release_date') or item.get('first_air_date') or '')[:4]
+            overview = item.get('overview') or 'No overview available'
+            poster_path = item.get('poster_path')
+            results.append(
+                InlineQueryResultArticle(
+                    id=content_id,
+                    title=title,
+                    description=f"{media_type} ({year})\n{overview[:150]}...",
+                    input_message_content=InputTextMessageContent(
+                        message_text=f"🎬 *{title}* ({year})\n\n{overview}",
+                        parse_mode='Markdown'
+                    ),
+                    thumb_url=f"{TMDB_IMAGE_BASE_URL}{poster_path}" if poster_path else None
+                )
+            )
+        return watchlist_text, results
+
     def anonymize_data(self, data: str) -> str:
         """Anonymize user data using SHA-256 hashing"""
         return hashlib.sha256(data.encode()).hexdigest()
@@ -920,44 +2414,192 @@ class MovieBot:
         )
 
     # Monitoring metrics
-    SEARCH_LATENCY = Histogram('search_latency_seconds', 'Search request latency')
-    API_REQUESTS = Counter('tmdb_api_requests_total', 'Total TMDB API requests')
-    ERROR_COUNT = Counter('bot_errors_total', 'Total number of bot errors')
+    SEARCH_LATENCY = LazyMetric('Histogram', 'search_latency_seconds', 'Search request latency')
+    API_REQUESTS = LazyMetric('Counter', 'tmdb_api_requests_total', 'Total TMDB API requests')
+    ERROR_COUNT = LazyMetric('Counter', 'bot_errors_total', 'Total number of bot errors')
+
+    async def timed_phase(self, name: str, awaitable):
+        """Await a startup step and record how long it took"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.startup_phases[name] = time.perf_counter() - started
+
+    def attach_watcher_index(self):
+        """Bind the watcher index to persisted bot_data, rebuilding it if missing"""
+        bot_data = self.application.bot_data
+        if 'watchers' not in bot_data:
+            bot_data['watchers'] = {}
+            self.watchers = WatcherIndex(bot_data['watchers'])
+            self.watchers.rebuild(self.application.user_data)
+        else:
+            self.watchers = WatcherIndex(bot_data['watchers'])
+
+    def rebuild_co_saves(self):
+        """Restore co-save signals from persisted watchlists and likes"""
+        self.similarity.rebuild_co_saves(
+            set(data.get('watchlist', [])) | set(data.get('liked_content', []))
+            for data in self.application.user_data.values()
+        )
+
+    async def start_web_server(self):
+        """Start the aiohttp site for health checks and metrics"""
+        runner = web.AppRunner(await self.web_app())
+        await runner.setup()
+        site = web.TCPSite(runner, '0.0.0.0', PORT)
+        await site.start()
+        logger.info("Web server started on port %s", PORT)
+
+    async def warm_up(self):
+        """Map the cache snapshot in the background, then report ready"""
+        started = time.perf_counter()
+        try:
+            if os.path.exists(CACHE_SNAPSHOT_PATH):
+                # Only the index is parsed; TMDB entries are decoded on first use
+                reader = await asyncio.get_running_loop().run_in_executor(
+                    None, SnapshotReader, CACHE_SNAPSHOT_PATH
+                )
+                self.tmdb_cache.snapshot = reader
+                posters = reader.load(POSTER_SNAPSHOT_KEY)
+                if posters:
+                    self.poster_file_ids.update(posters[1])
+                logger.info("Mapped cache snapshot with %s live records", len(reader.index))
+        except Exception as e:
+            logger.error("Error restoring cache snapshot: %s", e)
+
+        self.startup_phases['warm_up'] = time.perf_counter() - started
+        self.startup_phases['total'] = time.perf_counter() - MODULE_LOAD_STARTED
+        self.ready = True
+
+        report = ", ".join(
+            f"{phase}={seconds * 1000:.0f}ms" for phase, seconds in self.startup_phases.items()
+        )
+        logger.info("Startup timing: %s", report)
+
+    async def follow_changes(self):
+        """Start the change feed once the snapshot is mapped, so its first look-back reaches it"""
+        await self.warm_up()
+        await self.change_feed.run()
+
+    def collect_snapshot(self) -> list:
+        """Gather snapshot records on the event loop; serialization happens later"""
+        records = self.tmdb_cache.snapshot_records()
+        records[POSTER_SNAPSHOT_KEY] = (time.time() + POSTER_SNAPSHOT_TTL, dict(self.poster_file_ids))
+        return [(key, expires_at, value) for key, (expires_at, value) in records.items()]
+
+    async def snapshot_loop(self):
+        """Periodically write changed cache entries and remap the new file"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+            previous = self.tmdb_cache.snapshot
+            dirty = set(self.tmdb_cache.dirty)
+            records = self.collect_snapshot()
+            try:
+                await loop.run_in_executor(
+                    None, write_snapshot, CACHE_SNAPSHOT_PATH, records, previous
+                )
+                reader = await loop.run_in_executor(None, SnapshotReader, CACHE_SNAPSHOT_PATH)
+            except Exception as e:
+                logger.error("Error writing cache snapshot: %s", e)
+                self.tmdb_cache.dirty |= dirty
+                continue
+
+            # Drops that happened while writing must not come back from the new file
+            for key in self.tmdb_cache.forgotten:
+                reader.forget(key)
+            self.tmdb_cache.forgotten.clear()
+            self.tmdb_cache.snapshot = reader
+            if previous is not None:
+                previous.close()
+
+    def save_snapshot(self):
+        """Persist hot caches so the next boot starts warm"""
+        try:
+            write_snapshot(CACHE_SNAPSHOT_PATH, self.collect_snapshot(), self.tmdb_cache.snapshot)
+        except Exception as e:
+            logger.error("Error writing cache snapshot: %s", e)
+
+    def start_background(self, coroutine):
+        """Run a long-lived loop on the application; cancelled again at shutdown"""
+        self.background_tasks.append(self.application.create_task(coroutine))
+
+    async def stop_application(self):
+        """Stop polling and flush persistence so watchlists survive the restart"""
+        # Application.stop() waits for every create_task task, so end the endless loops first
+        for task in self.background_tasks:
+            task.cancel()
+        try:
+            if self.application.updater.running:
+                await self.application.updater.stop()
+            if self.application.running:
+                await self.application.stop()
+            await self.application.shutdown()
+        except Exception as e:
+            logger.error("Error shutting down application: %s", e)
 
     def run(self):
         """Run the bot and web server"""
         self.start_time = datetime.now()
         
-        async def start():
-            # Start notification system
-            await self.setup_notifications()
-            
-            # Start web server
-            runner = web.AppRunner(await self.web_app())
-            await runner.setup()
-            site = web.TCPSite(runner, '0.0.0.0', PORT)
-            await site.start()
-            
-            logger.info(f"Web server started on port {PORT}")
+        async def start(stopping: asyncio.Event):
+            # Web server and Telegram client come up concurrently
+            await asyncio.gather(
+                self.timed_phase('web_server', self.start_web_server()),
+                self.timed_phase('telegram_init', self.application.initialize())
+            )
+            self.attach_watcher_index()
+            self.rebuild_co_saves()
             
             # Start bot with polling
-            await self.application.initialize()
-            await self.application.start()
-            await self.application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+            await self.timed_phase('telegram_start', self.application.start())
+            await self.timed_phase(
+                'polling',
+                self.application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+            )
+
+            # Warm caches without holding up update processing
+            self.start_background(self.follow_changes())
+            self.start_background(self.feedback_log.run())
+            self.start_background(self.snapshot_loop())
+            self.start_background(self.overload.run())
+
+            # Start notification system
+            await self.setup_notifications()
             
-            # Keep the application running indefinitely
-            while True:
-                schedule.run_pending()  # Run scheduled tasks
-                await asyncio.sleep(1)
+            # Keep the application running until SIGINT/SIGTERM
+            await stopping.wait()
+            logger.info("Bot stopping")
+
+        async def main():
+            stopping = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, stopping.set)
+                except NotImplementedError:
+                    pass  # Windows: Ctrl+C still arrives as KeyboardInterrupt
+            try:
+                await start(stopping)
+            finally:
+                await self.stop_application()
 
         # Run the async function
         try:
-            asyncio.run(start())
+            asyncio.run(main())
         except KeyboardInterrupt:
             logger.info("Bot stopped by user")
         except Exception as e:
-            logger.error(f"Error starting application: {e}")
+            logger.error("Error starting application: %s", e)
+        finally:
+            self.save_snapshot()
+            self.feedback_log.flush()
 
 if __name__ == '__main__':
-    bot = MovieBot()
-    bot.run()   
+    import sys
+    if sys.argv[1:2] == ['feedback']:
+        export_feedback(sys.argv[2:])
+    else:
+        bot = MovieBot()
+        bot.run()   
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("telegram")
+
+import app
+
+
+class FakeChanges:
+    """Stands in for TMDB's /movie/changes and /tv/changes, two results per page"""
+
+    def __init__(self, movie_ids=(), tv_ids=()):
+        self.ids = {'movie': list(movie_ids), 'tv': list(tv_ids)}
+        self.requests = []
+
+    async def __call__(self, endpoint, params):
+        self.requests.append((endpoint, dict(params)))
+        ids = self.ids[endpoint.strip('/').split('/')[0]]
+        pages = max(1, (len(ids) + 1) // 2)
+        page = params['page']
+        return {
+            'page': page,
+            'total_pages': pages,
+            'results': [{'id': item_id} for item_id in ids[(page - 1) * 2:page * 2]],
+        }
+
+
+def poll(cache, fake):
+    applied = []
+
+    def on_change(media_type, item_ids):
+        applied.append((media_type, set(item_ids)))
+        cache.invalidate_titles(media_type, item_ids)
+
+    asyncio.run(app.ChangeFeedWorker(fake, on_change).poll_once())
+    return applied
+
+
+def test_only_changed_titles_are_evicted():
+    cache = app.TmdbCache()
+    cache.put('/movie/550', {'language': 'en'}, {'id': 550})
+    cache.put('/movie/550/credits', {}, {'cast': []})
+    cache.put('/movie/551', {'language': 'en'}, {'id': 551})
+    cache.put('/tv/550', {}, {'id': 550})
+
+    fake = FakeChanges(movie_ids=[550, 1, 2], tv_ids=[])
+    applied = poll(cache, fake)
+
+    assert applied == [('movie', {'550', '1', '2'})]
+    assert [params['page'] for _, params in fake.requests] == [1, 2, 1]
+    assert cache.get('/movie/550', {'language': 'en'}) is None
+    assert cache.get('/movie/550/credits', {}) is None
+    assert cache.get('/movie/551', {'language': 'en'}) == {'id': 551}
+    assert cache.get('/tv/550', {}) == {'id': 550}
+
+
+def test_title_changed_again_the_same_day_is_evicted_again():
+    cache = app.TmdbCache()
+    worker = app.ChangeFeedWorker(
+        FakeChanges(movie_ids=[550]),
+        lambda media_type, item_ids: cache.invalidate_titles(media_type, item_ids)
+    )
+
+    cache.put('/movie/550', {}, {'title': 'first'})
+    asyncio.run(worker.poll_once())
+    cache.put('/movie/550', {}, {'title': 'refetched'})
+    asyncio.run(worker.poll_once())
+
+    assert cache.get('/movie/550', {}) is None
+
+
+def test_snapshot_records_of_changed_titles_do_not_come_back(tmp_path):
+    path = str(tmp_path / 'snapshot.bin')
+    expires_at = time.time() + 3600
+    app.write_snapshot(path, [
+        (app.TmdbCache.snapshot_key(app.TmdbCache.key('/movie/550', {})), expires_at, {'id': 550}),
+        (app.TmdbCache.snapshot_key(app.TmdbCache.key('/movie/551', {})), expires_at, {'id': 551}),
+    ], None)
+
+    cache = app.TmdbCache()
+    cache.snapshot = app.SnapshotReader(path)
+    try:
+        poll(cache, FakeChanges(movie_ids=[550]))
+
+        assert cache.get('/movie/550', {}) is None
+        assert cache.get('/movie/551', {}) == {'id': 551}
+    finally:
+        cache.snapshot.close()
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("telegram")
+
+import app
+
+
+def movie(movie_id, cast=(), similar=()):
+    return {
+        'id': movie_id,
+        'title': f"Movie {movie_id}",
+        'genre_ids': [18],
+        'credits': {'cast': [{'id': actor} for actor in cast]},
+        'similar': {'results': [{'id': other, 'title': f"Movie {other}", 'genre_ids': [18]}
+                                for other in similar]},
+    }
+
+
+def test_shared_cast_links_indexed_titles():
+    index = app.SimilarityIndex()
+    index.build(movie(1, cast=[100]))
+    index.build(movie(2, cast=[100, 200]))
+
+    assert ('1', 'Movie 1') in index.similar('2')
+
+
+def test_index_is_bounded_and_evicts_cast_postings():
+    index = app.SimilarityIndex(max_sources=2, max_titles=5)
+    for movie_id in range(1, 5):
+        index.build(movie(movie_id, cast=[movie_id], similar=range(100 * movie_id, 100 * movie_id + 3)))
+
+    assert list(index.neighbors) == ['3', '4']
+    assert set(index.cast) == {'3', '4'}
+    assert set(index.cast_titles) == {3, 4}
+    assert len(index.titles) <= 5
+    assert set(index.genres) == set(index.titles)